@@ -1,37 +1,70 @@
 #!/usr/bin/env python3
 """Record once, then transcribe with all Whisper models to compare quality and speed."""
 
+import argparse
 import time
 import sys
+from collections import Counter
 import numpy as np
 import sounddevice as sd
-from dictate import record_until_enter, save_wav
+from dictate import (COMPUTE_TYPES, default_language, default_threads,
+                     record_until_enter, resolve_compute_type, save_wav,
+                     set_thread_env)
 
 MODELS = ["base", "small", "medium"]
 
 
 def find_word_diffs(texts):
     """Find words that differ between transcriptions."""
-    word_lists = [t.lower().split() for t in texts]
-    if not any(word_lists):
-        return []
+    counters = [Counter(t.lower().split()) for t in texts]
+    if not any(counters):
+        return set()
 
-    # Find words present in some but not all outputs
-    all_words = set()
-    for wl in word_lists:
-        all_words.update(wl)
-
-    differing = set()
-    for word in all_words:
-        counts = [wl.count(word) for wl in word_lists]
-        if len(set(counts)) > 1:
-            differing.add(word)
-    return differing
+    # Words whose count differs between any two outputs
+    all_words = set().union(*counters)
+    return {w for w in all_words if len({c[w] for c in counters}) > 1}
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Compare Whisper models on one recording")
+    parser.add_argument("--beam-size", type=int, default=1,
+                        help="Beam size for decoding (default: 1, greedy — "
+                             "pass 5 to compare against the old default)")
+    parser.add_argument("--compute-type", type=str, default="auto",
+                        choices=COMPUTE_TYPES,
+                        help="CTranslate2 compute type (default: auto — probes CPU flags)")
+    parser.add_argument("--iterations", "-n", type=int, default=1,
+                        help="Transcribe the recording N times per model and report the "
+                             "average (default: 1). With N > 1 the first run is treated "
+                             "as a warmup and excluded, so times reflect steady state.")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="CPU threads for inference (default: physical core count)")
+    parser.add_argument("--language", type=str, default=default_language(),
+                        help="Language hint to skip detection (default: $DICTATE_LANG "
+                             "or 'en'; pass 'auto' to detect with the first model)")
+    parser.add_argument("--save-wav", type=str, default=None, metavar="PATH",
+                        help="Also save the recording as a WAV file for debugging")
+    args = parser.parse_args()
+
+    threads = args.threads or default_threads()
+    set_thread_env(threads)
     from faster_whisper import WhisperModel
 
+    # Load every model up front so load time doesn't serialize into the
+    # comparison — all three co-reside comfortably in RAM, and repeated
+    # recordings reuse the warm models
+    compute_type = resolve_compute_type(args.compute_type)
+    models = {}
+    load_times = {}
+    for model_name in MODELS:
+        print(f"🔄 Loading '{model_name}' model...")
+        t0 = time.time()
+        models[model_name] = WhisperModel(model_name, device="cpu",
+                                          compute_type=compute_type,
+                                          cpu_threads=threads, num_workers=1)
+        load_times[model_name] = time.time() - t0
+    print(f"All models loaded in {sum(load_times.values()):.1f}s.\n")
+
     # Record once
     samplerate = 16000
     print("Say something and we'll run it through all 3 models.\n")
@@ -41,38 +74,49 @@ def main():
         print("Recording seems silent. Check your microphone.", file=sys.stderr)
         sys.exit(1)
 
-    wav_path = "/tmp/whisper_compare_test.wav"
-    save_wav(audio, wav_path, samplerate)
+    if args.save_wav:
+        save_wav(audio, args.save_wav, samplerate)
+        print(f"Saved recording to {args.save_wav}")
     duration = len(audio) / samplerate
     print(f"Recorded {duration:.1f}s of audio.\n")
     print("=" * 60)
 
     results = []
-
-    for model_name in MODELS:
-        print(f"\n🔄 Loading '{model_name}' model...")
-        t0 = time.time()
-        model = WhisperModel(model_name, device="cpu", compute_type="int8")
-        load_time = time.time() - t0
-
-        print(f"   Transcribing...")
-
-        t0 = time.time()
-        segments, info = model.transcribe(wav_path, beam_size=5)
-        text = "".join(s.text for s in segments).strip()
-        transcribe_time = time.time() - t0
+    language = None if args.language == "auto" else args.language
+
+    for model_name, model in models.items():
+        print(f"\n🔄 '{model_name}': transcribing...")
+
+        # With multiple iterations, the first call warms up CTranslate2's
+        # kernels and is excluded from the reported time.
+        runs = args.iterations + 1 if args.iterations > 1 else 1
+        times = []
+        for _ in range(runs):
+            t0 = time.time()
+            segments, info = model.transcribe(
+                audio, beam_size=args.beam_size, vad_filter=True,
+                **({"language": language} if language else {}))
+            text = "".join(s.text for s in segments).strip()
+            times.append(time.time() - t0)
+        if len(times) > 1:
+            times = times[1:]
+        transcribe_time = sum(times) / len(times)
+
+        # Detect the language once with the first model, then hint the rest
+        # so they skip their own detection pass
+        if language is None:
+            language = info.language
 
         results.append({
             "model": model_name,
             "text": text,
             "time": transcribe_time,
-            "load_time": load_time,
+            "load_time": load_times[model_name],
             "language": info.language,
             "lang_prob": info.language_probability,
         })
 
         print(f"   Done ({transcribe_time:.1f}s)")
-        del model
 
     # --- Summary ---
     print("\n" + "=" * 60)
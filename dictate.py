@@ -6,15 +6,18 @@ Usage:
     python dictate.py              # Record until you press Enter, then transcribe
     python dictate.py --duration 5 # Record for 5 seconds
     python dictate.py --model small # Use a different model (base, small, medium)
+    python dictate.py --repl       # Interactive loop: dictate repeatedly
 
 The transcribed text is printed to stdout and copied to clipboard if xclip/wl-copy is available.
 """
 
 import argparse
+import json
+import os
+import socket
 import sys
-import threading
-import tempfile
 import subprocess
+import tempfile
 import wave
 import struct
 
@@ -22,17 +25,152 @@ import numpy as np
 import sounddevice as sd
 
 
+COMPUTE_TYPES = ["auto", "int8", "int8_float16", "int8_float32", "int8_bfloat16",
+                 "float16", "float32"]
+MODEL_SIZES = ["auto", "tiny", "base", "small", "medium"]
+
+MAX_RECORD_SECONDS = 600  # capture buffer capacity (~37 MB of float32 at 16 kHz)
+
+
+def _cpu_flags():
+    """Return the CPU feature flags from /proc/cpuinfo (empty set if unreadable)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def resolve_compute_type(choice="auto"):
+    """Pick a CTranslate2 compute type for this CPU.
+
+    CPUs with native BF16 get int8_bfloat16: int8 weights for memory
+    bandwidth, BF16 accumulation for fast dense math. Pure int8 GEMMs are
+    only fast with VNNI instructions; on older hardware int8_float32 (int8
+    weights, float32 activations) is usually faster.
+    """
+    if choice != "auto":
+        return choice
+    flags = _cpu_flags()
+    if "avx512_bf16" in flags:
+        return "int8_bfloat16"
+    if "avx512_vnni" in flags or "avx_vnni" in flags:
+        return "int8"
+    return "int8_float32"
+
+
+def default_threads():
+    """Estimate physical core count: half the logical CPUs (assumes SMT)."""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def set_thread_env(threads):
+    """Cap BLAS/OpenMP thread pools before faster_whisper is imported.
+
+    Oversubscribing logical cores causes context-switch overhead in the
+    encoder GEMMs — a common cause of int8 running slower than fp32.
+    """
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(threads))
+
+
+def default_language():
+    """Language hint for transcription: $DICTATE_LANG, else English."""
+    return os.environ.get("DICTATE_LANG", "en")
+
+
+def language_kwargs(language):
+    """Transcribe kwargs for a language hint; 'auto' keeps detection enabled.
+
+    A known language skips faster-whisper's detection pass (an extra
+    encoder+decoder run over the first 30 s) before decoding starts.
+    """
+    return {} if language == "auto" else {"language": language}
+
+
+def choose_default_model():
+    """Pick the largest Whisper model this CPU can run at dictation speed.
+
+    Rough heuristic from instruction-set support and core count: AMX
+    (Sapphire Rapids+) handles 'medium', VNNI with a few cores handles
+    'small', plain AVX2 runs 'base', anything older gets 'tiny'.
+    """
+    flags = _cpu_flags()
+    if "amx_int8" in flags:
+        return "medium"
+    if ("avx512_vnni" in flags or "avx_vnni" in flags) and default_threads() >= 4:
+        return "small"
+    if "avx2" in flags:
+        return "base"
+    return "tiny"
+
+
+def resolve_model(choice="auto"):
+    """Resolve a --model argument, mapping 'auto' to the CPU-based default."""
+    return choose_default_model() if choice == "auto" else choice
+
+
+def daemon_socket_path():
+    """Unix socket where a running dictated.py daemon listens."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir())
+    return os.path.join(runtime_dir, "dictate.sock")
+
+
+def transcribe_via_daemon(audio, **params):
+    """Transcribe through a running dictated.py daemon.
+
+    Sends a JSON header line plus raw float32 samples and returns the text,
+    or None if no daemon is reachable (caller falls back to in-process).
+    """
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(daemon_socket_path())
+    except OSError:
+        return None
+    try:
+        header = json.dumps({"n_samples": len(audio), "params": params})
+        sock.sendall(header.encode() + b"\n")
+        sock.sendall(audio.tobytes())
+        sock.shutdown(socket.SHUT_WR)
+        reply = b""
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            reply += data
+        response = json.loads(reply.decode())
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    if "error" in response:
+        print(f"⚠️  Daemon error: {response['error']}", file=sys.stderr)
+        return None
+    return response["text"]
+
+
 def record_until_enter(samplerate=16000):
     """Record audio until the user presses Enter."""
     print("🎤 Recording... Press ENTER to stop.\n")
 
-    audio_chunks = []
-    stop_event = threading.Event()
+    # Preallocate the whole capture buffer: the callback just writes into it,
+    # instead of accumulating hundreds of small copied arrays that need a big
+    # concatenate at the end. Recording stops filling after MAX_RECORD_SECONDS.
+    buf = np.empty(MAX_RECORD_SECONDS * samplerate, dtype=np.float32)
+    write_idx = 0
 
     def callback(indata, frames, time, status):
+        nonlocal write_idx
         if status:
             print(f"  (audio warning: {status})", file=sys.stderr)
-        audio_chunks.append(indata.copy())
+        n = min(frames, len(buf) - write_idx)
+        if n:
+            buf[write_idx:write_idx + n] = indata[:n, 0]
+            write_idx += n
 
     stream = sd.InputStream(
         samplerate=samplerate,
@@ -43,15 +181,14 @@ def record_until_enter(samplerate=16000):
 
     stream.start()
     input()  # blocks until Enter
-    stop_event.set()
     stream.stop()
     stream.close()
 
-    if not audio_chunks:
+    if write_idx == 0:
         print("No audio recorded.", file=sys.stderr)
         sys.exit(1)
 
-    return np.concatenate(audio_chunks, axis=0).flatten()
+    return buf[:write_idx].copy()
 
 
 def record_duration(duration, samplerate=16000):
@@ -69,7 +206,9 @@ def record_duration(duration, samplerate=16000):
 
 def save_wav(audio, path, samplerate=16000):
     """Save float32 audio array to a 16-bit WAV file."""
-    audio_int16 = np.clip(audio * 32767, -32768, 32767).astype(np.int16)
+    # Capture audio is already in [-1, 1], so no clip is needed; a single
+    # rint+cast avoids the extra temporaries of the old multiply/clip/astype chain
+    audio_int16 = np.rint(audio * 32767.0).astype(np.int16)
     with wave.open(path, "w") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
@@ -77,14 +216,24 @@ def save_wav(audio, path, samplerate=16000):
         wf.writeframes(audio_int16.tobytes())
 
 
-def transcribe(audio_path, model_size="base"):
-    """Transcribe audio file using faster-whisper."""
+def transcribe(audio, model_size="auto", beam_size=1, compute_type="auto",
+               threads=None, language=None):
+    """Transcribe a float32 audio array (16 kHz mono) using faster-whisper."""
+    model_size = resolve_model(model_size)
+    language = language or default_language()
+    threads = threads or default_threads()
+    set_thread_env(threads)
     from faster_whisper import WhisperModel
 
     print(f"📝 Transcribing with '{model_size}' model (first run downloads the model)...\n")
 
-    model = WhisperModel(model_size, device="cpu", compute_type="int8")
-    segments, info = model.transcribe(audio_path, beam_size=5)
+    model = WhisperModel(model_size, device="cpu",
+                         compute_type=resolve_compute_type(compute_type),
+                         cpu_threads=threads, num_workers=1)
+    # faster-whisper accepts the raw array directly — no WAV round-trip needed
+    segments, info = model.transcribe(audio.astype(np.float32, copy=False),
+                                      beam_size=beam_size, vad_filter=True,
+                                      **language_kwargs(language))
 
     text_parts = []
     for segment in segments:
@@ -93,6 +242,75 @@ def transcribe(audio_path, model_size="base"):
     return "".join(text_parts).strip()
 
 
+def repl(args, samplerate=16000):
+    """Interactive dictation loop that keeps one input stream open.
+
+    Opening a PulseAudio/PipeWire stream costs 50-200 ms per utterance;
+    reusing the stream makes each recording start instantly. Run dictated.py
+    alongside for a fully warm path (no per-utterance model load either).
+    """
+    buf = np.empty(MAX_RECORD_SECONDS * samplerate, dtype=np.float32)
+    write_idx = 0
+    recording = False
+
+    def callback(indata, frames, time, status):
+        nonlocal write_idx
+        if status:
+            print(f"  (audio warning: {status})", file=sys.stderr)
+        if not recording:
+            return
+        n = min(frames, len(buf) - write_idx)
+        if n:
+            buf[write_idx:write_idx + n] = indata[:n, 0]
+            write_idx += n
+
+    stream = sd.InputStream(
+        samplerate=samplerate,
+        channels=1,
+        dtype="float32",
+        callback=callback,
+    )
+    stream.start()
+
+    print("REPL mode — Ctrl+C or Ctrl+D to quit.")
+    try:
+        while True:
+            input("\n⏎  Press ENTER to start recording...")
+            write_idx = 0
+            recording = True
+            input("🎤 Recording... Press ENTER to stop.")
+            recording = False
+
+            audio = buf[:write_idx].copy()
+            if len(audio) == 0 or np.max(np.abs(audio)) < 0.001:
+                print("⚠️  Recording seems silent. Check your microphone.",
+                      file=sys.stderr)
+                continue
+
+            text = transcribe_via_daemon(audio, beam_size=args.beam_size,
+                                         vad_filter=True,
+                                         **language_kwargs(args.language))
+            if text is None:
+                text = transcribe(audio, args.model, beam_size=args.beam_size,
+                                  compute_type=args.compute_type,
+                                  threads=args.threads, language=args.language)
+
+            if text:
+                print("=" * 50)
+                print(text)
+                print("=" * 50)
+                tool = copy_to_clipboard(text)
+                if tool:
+                    print(f"✅ Copied to clipboard (via {tool})")
+            else:
+                print("(No speech detected)", file=sys.stderr)
+    except (KeyboardInterrupt, EOFError):
+        print("\nBye.")
+    finally:
+        stream.stop()
+        stream.close()
+
+
 def copy_to_clipboard(text):
     """Try to copy text to system clipboard."""
     for cmd in [["wl-copy"], ["xclip", "-selection", "clipboard"]]:
@@ -108,9 +326,24 @@ def main():
     parser = argparse.ArgumentParser(description="Voice-to-text dictation using local Whisper")
     parser.add_argument("--duration", "-d", type=float, default=None,
                         help="Record for N seconds (default: record until Enter)")
-    parser.add_argument("--model", "-m", type=str, default="base",
-                        choices=["base", "small", "medium"],
-                        help="Whisper model size (default: base)")
+    parser.add_argument("--model", "-m", type=str, default="auto",
+                        choices=MODEL_SIZES,
+                        help="Whisper model size (default: auto — picks the largest "
+                             "model this CPU can run at dictation speed)")
+    parser.add_argument("--beam-size", type=int, default=1,
+                        help="Beam size for decoding (default: 1, greedy — "
+                             "larger values are slower for little gain on short clips)")
+    parser.add_argument("--compute-type", type=str, default="auto",
+                        choices=COMPUTE_TYPES,
+                        help="CTranslate2 compute type (default: auto — probes CPU flags)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="CPU threads for inference (default: physical core count)")
+    parser.add_argument("--language", type=str, default=default_language(),
+                        help="Language hint to skip detection (default: $DICTATE_LANG "
+                             "or 'en'; pass 'auto' to detect)")
+    parser.add_argument("--repl", action="store_true",
+                        help="Interactive mode: dictate repeatedly without reopening "
+                             "the audio stream between utterances")
     parser.add_argument("--list-devices", action="store_true",
                         help="List available audio input devices and exit")
     parser.add_argument("--device", type=int, default=None,
@@ -124,6 +357,10 @@ def main():
     if args.device is not None:
         sd.default.device[0] = args.device
 
+    if args.repl:
+        repl(args)
+        return
+
     # Record
     samplerate = 16000
     if args.duration:
@@ -136,12 +373,13 @@ def main():
         print("⚠️  Recording seems silent. Check your microphone.", file=sys.stderr)
         sys.exit(1)
 
-    # Save to temp file and transcribe
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-        wav_path = f.name
-        save_wav(audio, wav_path, samplerate)
-
-    text = transcribe(wav_path, args.model)
+    # A running dictated.py daemon already holds a warm model — prefer it
+    text = transcribe_via_daemon(audio, beam_size=args.beam_size, vad_filter=True,
+                                 **language_kwargs(args.language))
+    if text is None:
+        text = transcribe(audio, args.model, beam_size=args.beam_size,
+                          compute_type=args.compute_type, threads=args.threads,
+                          language=args.language)
 
     if not text:
         print("(No speech detected)", file=sys.stderr)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Long-lived dictation daemon holding a warm Whisper model.
+
+Loads the model once and serves transcription requests over a Unix socket at
+$XDG_RUNTIME_DIR/dictate.sock. dictate.py and live.py connect to it
+automatically when it is running, turning their 1-3 s cold model load into a
+warm call. Stop with Ctrl+C.
+
+Usage:
+    python dictated.py             # Serve the 'base' model
+    python dictated.py -m small    # Serve a more accurate model
+
+Protocol (one request per connection):
+    -> one JSON line {"n_samples": N, "params": {...}}, then N float32 samples
+    <- one JSON line {"text": "..."} or {"error": "..."}
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+import numpy as np
+
+from dictate import (COMPUTE_TYPES, MODEL_SIZES, daemon_socket_path,
+                     default_threads, resolve_compute_type, resolve_model,
+                     set_thread_env)
+
+
+def handle_request(conn, model):
+    """Read one transcription request from conn and send back the text."""
+    f = conn.makefile("rb")
+    header = json.loads(f.readline())
+    n_samples = int(header["n_samples"])
+    params = header.get("params", {})
+
+    payload = f.read(n_samples * 4)
+    audio = np.frombuffer(payload, dtype=np.float32)
+
+    try:
+        segments, _ = model.transcribe(audio, **params)
+        reply = {"text": "".join(s.text for s in segments).strip()}
+    except Exception as e:
+        reply = {"error": str(e)}
+    conn.sendall((json.dumps(reply) + "\n").encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dictation daemon with a warm Whisper model")
+    parser.add_argument("--model", "-m", type=str, default="auto",
+                        choices=MODEL_SIZES,
+                        help="Whisper model size (default: auto — picks the largest "
+                             "model this CPU can run at dictation speed)")
+    parser.add_argument("--compute-type", type=str, default="auto",
+                        choices=COMPUTE_TYPES,
+                        help="CTranslate2 compute type (default: auto — probes CPU flags)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="CPU threads for inference (default: physical core count)")
+    args = parser.parse_args()
+
+    model_size = resolve_model(args.model)
+    threads = args.threads or default_threads()
+    set_thread_env(threads)
+    from faster_whisper import WhisperModel
+
+    print(f"Loading '{model_size}' model...", end=" ", flush=True)
+    model = WhisperModel(model_size, device="cpu",
+                         compute_type=resolve_compute_type(args.compute_type),
+                         cpu_threads=threads, num_workers=1)
+    print("ready.")
+
+    sock_path = daemon_socket_path()
+    if os.path.exists(sock_path):
+        os.unlink(sock_path)  # stale socket from a previous run
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(sock_path)
+    server.listen(1)
+    print(f"🎧 Serving dictation requests on {sock_path} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            try:
+                handle_request(conn, model)
+            except Exception as e:
+                print(f"  (request failed: {e})", file=sys.stderr)
+            finally:
+                conn.close()
+    except KeyboardInterrupt:
+        print("\nStopping.")
+    finally:
+        server.close()
+        if os.path.exists(sock_path):
+            os.unlink(sock_path)
+
+
+if __name__ == "__main__":
+    main()
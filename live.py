@@ -13,27 +13,64 @@ Usage:
 
 import argparse
 import sys
-import threading
 import time
 import subprocess
-import tempfile
-import wave
 
 import numpy as np
 import sounddevice as sd
 
+from dictate import (COMPUTE_TYPES, MODEL_SIZES, default_language,
+                     default_threads, language_kwargs, resolve_compute_type,
+                     resolve_model, set_thread_env, transcribe_via_daemon)
 
-SAMPLERATE = 16000
 
+SAMPLERATE = 16000
 
-def save_wav(audio, path):
-    """Save float32 audio array to a 16-bit WAV file."""
-    audio_int16 = np.clip(audio * 32767, -32768, 32767).astype(np.int16)
-    with wave.open(path, "w") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLERATE)
-        wf.writeframes(audio_int16.tobytes())
+# Ring capacity matches Whisper's 30-s encoder window: samples older than
+# that can't contribute to a transcription anyway (the overflow clamp in the
+# loop drops them), so memory stays ~2 MB no matter how long the session runs
+MAX_BUFFER_SECONDS = 30
+
+# Silero VAD pre-trim settings: tight enough to cut inter-word silence out of
+# the encoder's input, padded enough not to clip word edges
+VAD_PARAMETERS = dict(min_silence_duration_ms=200, speech_pad_ms=50, threshold=0.4)
+
+# Decode settings for the chunk loop: skip timestamp tokens (we discard them
+# anyway) and don't condition on previous text — chunks are independent, and
+# conditioning across them invites hallucination drift
+CHUNK_DECODE_ARGS = dict(beam_size=1, without_timestamps=True,
+                         condition_on_previous_text=False, temperature=0.0,
+                         vad_filter=True)
+
+
+def ring_read(ring, start_abs, end_abs):
+    """Copy the span [start_abs, end_abs) out of the ring as a contiguous array.
+
+    Indices are monotonic sample counts; the caller must keep the span within
+    the ring's capacity.
+    """
+    n = len(ring)
+    span = end_abs - start_abs
+    if span <= 0:
+        return np.empty(0, dtype=ring.dtype)
+    start = start_abs % n
+    stop = start + span
+    if stop <= n:
+        return ring[start:stop].copy()
+    return np.concatenate((ring[start:], ring[:stop - n]))
+
+
+def is_likely_speech(chunk):
+    """Cheap energy + zero-crossing precheck to skip Whisper on non-speech.
+
+    Speech sits in a moderate zero-crossing band: broadband hiss is higher,
+    hum and rumble lower. Costs microseconds vs ~100 ms for an encoder pass.
+    """
+    rms = np.sqrt(np.mean(chunk * chunk))
+    if rms < 0.01:
+        return False
+    zcr = np.mean(np.diff(np.sign(chunk)) != 0)
+    return 0.02 < zcr < 0.25
 
 
 def copy_to_clipboard(text):
@@ -49,36 +86,80 @@ def copy_to_clipboard(text):
 
 def main():
     parser = argparse.ArgumentParser(description="Real-time voice-to-text dictation")
-    parser.add_argument("--model", "-m", type=str, default="base",
-                        choices=["base", "small", "medium"],
-                        help="Whisper model size (default: base)")
+    parser.add_argument("--model", "-m", type=str, default="auto",
+                        choices=MODEL_SIZES,
+                        help="Whisper model size (default: auto — picks the largest "
+                             "model this CPU can run at dictation speed)")
     parser.add_argument("--chunk", "-c", type=float, default=2,
                         help="Process audio every N seconds (default: 2)")
+    parser.add_argument("--compute-type", type=str, default="auto",
+                        choices=COMPUTE_TYPES,
+                        help="CTranslate2 compute type (default: auto — probes CPU flags)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="CPU threads for inference (default: physical core count)")
+    parser.add_argument("--language", type=str, default=default_language(),
+                        help="Language hint to skip detection (default: $DICTATE_LANG "
+                             "or 'en'; pass 'auto' to detect)")
     parser.add_argument("--device", type=int, default=None,
                         help="Audio input device index")
     args = parser.parse_args()
 
-    from faster_whisper import WhisperModel
-
-    print(f"Loading '{args.model}' model...", end=" ", flush=True)
-    model = WhisperModel(args.model, device="cpu", compute_type="int8")
-    print("ready.\n")
+    # A known language skips the detection pass every chunk would otherwise pay
+    decode_args = dict(CHUNK_DECODE_ARGS, vad_parameters=VAD_PARAMETERS,
+                       **language_kwargs(args.language))
+
+    # A running dictated.py daemon already holds a warm model — prefer it and
+    # skip the local load entirely (the probe also warms the daemon's kernels)
+    model = None
+    if transcribe_via_daemon(np.zeros(SAMPLERATE // 2, dtype=np.float32),
+                             beam_size=1) is not None:
+        print("Using dictated.py daemon (warm model).\n")
+    else:
+        model_size = resolve_model(args.model)
+        threads = args.threads or default_threads()
+        set_thread_env(threads)
+        from faster_whisper import WhisperModel
+
+        print(f"Loading '{model_size}' model...", end=" ", flush=True)
+        model = WhisperModel(model_size, device="cpu",
+                             compute_type=resolve_compute_type(args.compute_type),
+                             cpu_threads=threads, num_workers=1)
+        # Warm up CTranslate2's lazily-specialized kernels on a second of
+        # silence so the first real chunk doesn't pay the compilation spike
+        warmup = np.zeros(SAMPLERATE, dtype=np.float32)
+        list(model.transcribe(warmup, beam_size=1, without_timestamps=True,
+                              vad_filter=False)[0])
+        print("ready.\n")
 
     print("🎤 Listening... Speak now. Press Ctrl+C to stop.\n")
     print("─" * 50)
 
-    audio_buffer = []
-    buffer_lock = threading.Lock()
-    committed_text = []      # Finalized lines
-    committed_samples = 0    # How far we've committed
-    tmp_path = tempfile.mktemp(suffix=".wav")
-    chunk_samples = int(args.chunk * SAMPLERATE)
+    # Preallocated ring buffer: per-tick work stays O(chunk) no matter how
+    # long the session runs (the old list-of-chunks paid an O(session)
+    # concatenate every tick and grew without bound).
+    #
+    # Single producer (audio callback) / single consumer (this loop), so no
+    # lock: the callback owns write_count, the loop owns read_idx, and the
+    # aligned 8-byte counter store publishes after the sample writes land.
+    # The callback runs on a realtime audio thread where lock contention
+    # shows up as input overflows.
+    ring = np.empty(SAMPLERATE * MAX_BUFFER_SECONDS, dtype=np.float32)
+    ring_size = len(ring)
+    write_count = np.zeros(1, dtype=np.int64)  # Total samples captured (monotonic)
+    read_idx = 0                               # Total samples committed (monotonic)
+    committed_text = []                        # Finalized lines
 
     def audio_callback(indata, frames, time_info, status):
         if status:
             print(f"\n  (audio: {status})", file=sys.stderr)
-        with buffer_lock:
-            audio_buffer.append(indata.copy())
+        samples = indata[:, 0]
+        total = int(write_count[0])
+        pos = total % ring_size
+        first = min(frames, ring_size - pos)
+        ring[pos:pos + first] = samples[:first]
+        if first < frames:
+            ring[:frames - first] = samples[first:]
+        write_count[0] = total + frames  # Publish only after the samples land
 
     stream = sd.InputStream(
         samplerate=SAMPLERATE,
@@ -94,59 +175,69 @@ def main():
         while True:
             time.sleep(args.chunk)
 
-            with buffer_lock:
-                if not audio_buffer:
-                    continue
-                all_audio = np.concatenate(audio_buffer, axis=0).flatten()
+            end = int(write_count[0])
+            if end - read_idx > ring_size:
+                # Overflowed: the oldest unread samples were overwritten
+                read_idx = end - ring_size
 
-            new_audio = all_audio[committed_samples:]
+            new_audio = ring_read(ring, read_idx, end)
 
             # Need at least 0.3s of new audio
             if len(new_audio) < SAMPLERATE * 0.3:
                 continue
 
-            # Skip silence
-            if np.max(np.abs(new_audio)) < 0.005:
-                committed_samples = len(all_audio)
+            # Skip chunks that don't look like speech; faster-whisper's
+            # vad_filter below is the second-line check on what gets through
+            if not is_likely_speech(new_audio):
+                read_idx = end
                 continue
 
-            save_wav(new_audio, tmp_path)
-
-            segments, _ = model.transcribe(
-                tmp_path,
-                beam_size=1,
-                vad_filter=True,
-                vad_parameters=dict(
-                    min_silence_duration_ms=300,
-                    speech_pad_ms=100,
-                ),
-            )
-            new_text = "".join(s.text for s in segments).strip()
+            prefix = " ".join(committed_text)
+            if model is None:
+                new_text = (transcribe_via_daemon(new_audio, **decode_args)
+                            or "").strip()
+                if new_text:
+                    partial = (prefix + " " + new_text).strip()
+                    sys.stdout.write(f"\r\033[K{partial}")
+                    sys.stdout.flush()
+            else:
+                # Pass the array straight to faster-whisper — no WAV round-trip
+                segments, _ = model.transcribe(
+                    new_audio.astype(np.float32, copy=False),
+                    **decode_args,
+                )
+                # Print each segment as the generator yields it — words show up
+                # at first-segment time instead of after the whole chunk decodes
+                parts = []
+                for seg in segments:
+                    parts.append(seg.text)
+                    partial = (prefix + " " + "".join(parts).strip()).strip()
+                    sys.stdout.write(f"\r\033[K{partial}")
+                    sys.stdout.flush()
+                new_text = "".join(parts).strip()
 
             if new_text:
                 committed_text.append(new_text)
-                committed_samples = len(all_audio)
-
-                # Print full text so far
-                full = " ".join(committed_text)
-                sys.stdout.write(f"\r\033[K{full}")
-                sys.stdout.flush()
+                read_idx = end
 
     except KeyboardInterrupt:
         stream.stop()
         stream.close()
 
         # Final pass on any unprocessed audio
-        with buffer_lock:
-            if audio_buffer:
-                all_audio = np.concatenate(audio_buffer, axis=0).flatten()
-                remaining = all_audio[committed_samples:]
-                if len(remaining) > SAMPLERATE * 0.3 and np.max(np.abs(remaining)) > 0.005:
-                    save_wav(remaining, tmp_path)
-                    segments, _ = model.transcribe(tmp_path, beam_size=1, vad_filter=True)
-                    tail = "".join(s.text for s in segments).strip()
-                    if tail:
-                        committed_text.append(tail)
+        end = int(write_count[0])
+        if end - read_idx > ring_size:
+            read_idx = end - ring_size
+        remaining = ring_read(ring, read_idx, end)
+        if len(remaining) > SAMPLERATE * 0.3 and np.max(np.abs(remaining)) > 0.005:
+            if model is None:
+                tail = (transcribe_via_daemon(remaining, **decode_args)
+                        or "").strip()
+            else:
+                segments, _ = model.transcribe(remaining, **decode_args)
+                tail = "".join(s.text for s in segments).strip()
+            if tail:
+                committed_text.append(tail)
 
         final_text = " ".join(committed_text)
 